@@ -0,0 +1,111 @@
+"""
+Answers many source -> target queries at once, running one BFS per
+distinct source and streaming one JSON result per query.
+
+Each input line holds a source and a target separated by a tab,
+given as IMDB person ids or exact names.
+
+With --workers, sources are answered by a process pool whose workers
+memory-map the dataset's snapshot, so they share one read-only copy of the
+graph through the page cache instead of each holding their own.
+
+Usage: python batch.py [--workers N] directory [pairs]   (pairs defaults to stdin)
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+
+import degrees
+from degrees import graph
+
+
+def read_queries(lines):
+    """
+    Parses tab separated pairs, returning the queries grouped by source index
+    and a list of result records for lines that could not be resolved.
+    """
+    groups = {}
+    errors = []
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        fields = line.split("\t")
+        if len(fields) != 2:
+            errors.append({"line": number, "error": "expected source<TAB>target"})
+            continue
+        query = {"line": number, "source": fields[0], "target": fields[1]}
+        try:
+            source = degrees.resolve(fields[0])
+            target = degrees.resolve(fields[1])
+        except LookupError as error:
+            errors.append(dict(query, error=str(error)))
+            continue
+        groups.setdefault(source, []).append((target, query))
+    return groups, errors
+
+
+def answer(source, queries):
+    """
+    Answers every (target index, query record) pair for one source index
+    from a single BFS tree, returning the completed records.
+    """
+    tree = degrees.bfs_tree(source, [target for target, _ in queries])
+    results = []
+    for target, query in queries:
+        path = degrees.to_ids(degrees.tree_route(tree, target))
+        if path is None:
+            results.append(dict(query, degrees=None, path=None))
+        else:
+            results.append(dict(query, degrees=len(path), path=path))
+    return results
+
+
+def start_worker(directory):
+    """
+    Pool initializer: maps the snapshot the parent process already built,
+    unless the graph was inherited by fork.
+    """
+    if len(graph.person_ids) == 0:
+        degrees.load_data(directory)
+
+
+def answer_group(group):
+    return answer(*group)
+
+
+def write(results, out):
+    for result in results:
+        out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("pairs", nargs="?", default="-")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to answer sources with (default 1, in process)")
+    args = parser.parse_args()
+
+    degrees.load_data(args.directory)
+    if args.pairs == "-":
+        groups, errors = read_queries(sys.stdin)
+    else:
+        with open(args.pairs, encoding="utf-8") as f:
+            groups, errors = read_queries(f)
+
+    write(errors, sys.stdout)
+    if args.workers <= 1:
+        for source, queries in groups.items():
+            write(answer(source, queries), sys.stdout)
+        return
+
+    with multiprocessing.Pool(args.workers, start_worker, (args.directory,)) as pool:
+        for results in pool.imap_unordered(answer_group, groups.items()):
+            write(results, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmarks BFS over synthetic graphs with the list-backed frontier the
+project used to ship and the current deque-backed one from util.
+
+Usage: python benchmark.py [--edges N ...] [--legacy-limit N] [--seed N]
+"""
+import argparse
+import random
+import time
+
+from util import Node, QueueFrontier
+
+
+class ListQueueFrontier():
+    """The original frontier: list slicing on remove, linear contains_state."""
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def synthetic_graph(edges, seed):
+    """
+    Returns an adjacency list of a random undirected graph with the given
+    number of edges and an average degree of 10.
+    """
+    rng = random.Random(seed)
+    nodes = max(2, edges // 5)
+    adjacency = [[] for _ in range(nodes)]
+    for _ in range(edges):
+        a = rng.randrange(nodes)
+        b = rng.randrange(nodes)
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+    return adjacency
+
+
+def bfs(adjacency, source, frontier_class):
+    """
+    Runs the same BFS loop as degrees.shortest_path with no target,
+    returning how many nodes were explored.
+    """
+    frontier = frontier_class()
+    frontier.add(Node(state=source, parent=None, action=None))
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        explored.add(node.state)
+        for neighbor in adjacency[node.state]:
+            if not frontier.contains_state(neighbor) and neighbor not in explored:
+                frontier.add(Node(state=neighbor, parent=node, action=None))
+    return len(explored)
+
+
+def timed(adjacency, frontier_class):
+    start = time.perf_counter()
+    explored = bfs(adjacency, 0, frontier_class)
+    return time.perf_counter() - start, explored
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--edges", type=int, nargs="+",
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-limit", type=int, default=20_000,
+                        help="largest graph to run the quadratic list frontier on")
+    parser.add_argument("--seed", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'edges':>10} {'explored':>10} {'deque (s)':>10} {'list (s)':>10}")
+    for edges in args.edges:
+        adjacency = synthetic_graph(edges, args.seed)
+        seconds, explored = timed(adjacency, QueueFrontier)
+        legacy = "skipped"
+        if edges <= args.legacy_limit:
+            legacy = f"{timed(adjacency, ListQueueFrontier)[0]:.3f}"
+        print(f"{edges:>10} {explored:>10} {seconds:>10.3f} {legacy:>10}")
+
+
+if __name__ == "__main__":
+    main()
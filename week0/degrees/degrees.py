@@ -1,55 +1,28 @@
-import csv
+import heapq
+import math
 import sys
+from array import array
+from collections import deque
+from itertools import islice
 
+import snapshot
+from graph import Graph
+from names import NameIndex
 from util import Node, StackFrontier, QueueFrontier
 
-# Maps names to a set of corresponding person_ids
-names = {}
+# People and movies interned to ints, with adjacency in compressed sparse rows
+graph = Graph()
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
-
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Exact, prefix and fuzzy name search over the graph
+names = NameIndex(graph)
 
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    Load data from CSV files into memory,
+    through the directory's binary snapshot when it is current.
+    """
+    snapshot.load(graph, directory)
 
 
 def main():
@@ -78,18 +51,34 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person_names[graph.person_index(path[i][1])]
+            person2 = graph.person_names[graph.person_index(path[i + 1][1])]
+            movie = graph.movie_titles[graph.movie_index(path[i + 1][0])]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, landmarks=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+    If bidirectional is True, searches from both ends and meets in the middle.
+    If a landmarks.LandmarkIndex is given, runs A* guided by its distances.
+    """
+    if bidirectional:
+        return bidirectional_shortest_path(source, target)
+    if landmarks is not None:
+        route = astar_search(graph.person_index(source), graph.person_index(target), landmarks)
+        return to_ids(route)
+    route = breadth_first_search(graph.person_index(source), graph.person_index(target))
+    return to_ids(route)
+
+
+def breadth_first_search(source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source index to the target index, or None.
     """
     # we will consider the personas as the states, while the source is the starting state and the goal state the
     # person we need to reach through connections
@@ -108,10 +97,7 @@ def shortest_path(source, target):
         node = frontier.remove()
         # if target reached, go up to the root until reach source to return it
         if node.state == target:
-            route = []  # the list of tuples to return
-            while node.parent is not None:  # add the node and go up in the tree
-                route.append((node.action,node.state))
-                node = node.parent
+            route = trace_route(node)
             route.reverse()
             return route
 
@@ -119,27 +105,293 @@ def shortest_path(source, target):
         explored.add(node.state) # Since its a set,  only added if it's not exist
 
         # Add neighbors to frontier
-        for movie_id, person_id in neighbors_for_person(node.state):
+        for movie, person in graph.neighbors(node.state):
             # if not already explored, and not already in the frontier, add it to the frontier
-            if not frontier.contains_state(person_id) and person_id not in explored:
-                child = Node(state=person_id, parent=node, action=movie_id)
+            if not frontier.contains_state(person) and person not in explored:
+                child = Node(state=person, parent=node, action=movie)
                 frontier.add(child)
 
 
+def astar_search(source, target, landmarks):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source index to the target index, or None,
+    expanding people in order of degrees so far plus the landmark estimate.
+    """
+    if landmarks.bounds(source, target)[0] == math.inf:
+        return None
+    estimate = landmarks.heuristic(target)
+
+    start = Node(state=source, parent=None, action=None)
+    # best known degrees to each person
+    cost = {source: 0}
+    # (estimated total, tie breaker, degrees so far, node)
+    frontier = [(estimate(source), 0, 0, start)]
+    counter = 1
+    explored = set()
+
+    while frontier:
+        _, _, steps, node = heapq.heappop(frontier)
+        if node.state == target:
+            route = trace_route(node)
+            route.reverse()
+            return route
+        if node.state in explored:
+            continue
+        explored.add(node.state)
+
+        for movie, person in graph.neighbors(node.state):
+            if person in explored or cost.get(person, math.inf) <= steps + 1:
+                continue
+            cost[person] = steps + 1
+            child = Node(state=person, parent=node, action=movie)
+            heapq.heappush(frontier, (steps + 1 + estimate(person), counter, steps + 1, child))
+            counter += 1
+
+    return None
+
+
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends.
+
+    If no possible path, returns None.
+    """
+    route = bidirectional_search(graph.person_index(source), graph.person_index(target))
+    return to_ids(route)
+
+
+def bidirectional_search(source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source index to the target index, expanding one BFS layer
+    at a time from whichever side has the smaller frontier.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # every person reached from each side, mapped to its node in that side's tree
+    forward = {source: Node(state=source, parent=None, action=None)}
+    backward = {target: Node(state=target, parent=None, action=None)}
+    forward_layer = [forward[source]]
+    backward_layer = [backward[target]]
+
+    while forward_layer and backward_layer:
+        # expand the cheaper side
+        expand_forward = len(forward_layer) <= len(backward_layer)
+        if expand_forward:
+            layer, reached, other = forward_layer, forward, backward
+        else:
+            layer, reached, other = backward_layer, backward, forward
+
+        # finish the whole layer so the best meeting point wins, not the first one found
+        next_layer = []
+        best = None
+        for node in layer:
+            for movie, person in graph.neighbors(node.state):
+                if person in reached:
+                    continue
+                child = Node(state=person, parent=node, action=movie)
+                reached[person] = child
+                next_layer.append(child)
+                if person in other:
+                    length = depth(child) + depth(other[person])
+                    if best is None or length < best[0]:
+                        best = (length, person)
+
+        if best is not None:
+            meeting = best[1]
+            # source half: walk up to the source and flip into source -> meeting order
+            route = trace_route(forward[meeting])
+            route.reverse()
+            # target half: each step up the backward tree moves one person closer to the target
+            node = backward[meeting]
+            while node.parent is not None:
+                route.append((node.action, node.parent.state))
+                node = node.parent
+            return route
+
+        if expand_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def all_shortest_paths(source, target, avoid=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that connect
+    the source to the target, one at a time, in order of the ids along
+    the way. Two paths through the same people by different movies are
+    different paths.
+
+    avoid is an optional set of movie ids no path may go through. It is
+    checked as the search goes, so movies added to it between paths prune
+    the rest of the search.
+
+    Yields nothing if there is no possible path.
+    """
+    avoid = set() if avoid is None else avoid
+    source = graph.person_index(source)
+    target = graph.person_index(target)
+    from_source = layer_distances(source, target)
+    if target not in from_source:
+        return
+    length = from_source[target]
+    from_target = layer_distances(target, limit=length)
+
+    def extend(person, steps):
+        """Yields the routes on the shortest path DAG from person to the target."""
+        if steps == length:
+            yield []
+            return
+        # people one step further along some shortest path, with each movie that gets there
+        successors = []
+        for movie in graph.movies_of(person):
+            for costar in graph.stars_of(movie):
+                if (from_source.get(costar) == steps + 1
+                        and from_target.get(costar) == length - steps - 1):
+                    successors.append((graph.person_ids[costar], graph.movie_ids[movie], costar))
+        for person_id, movie_id, costar in sorted(set(successors)):
+            if movie_id in avoid:
+                continue
+            for rest in extend(costar, steps + 1):
+                yield [(movie_id, person_id)] + rest
+                if movie_id in avoid:
+                    break
+
+    yield from extend(source, 0)
+
+
+def k_shortest_paths(source, target, k, distinct_movies=False):
+    """
+    Yields up to k of the shortest lists of (movie_id, person_id) pairs
+    that connect the source to the target, in the order of all_shortest_paths.
+
+    If distinct_movies is True, skips any path that goes through a movie
+    an earlier yielded path already used, pruning the search at the
+    first such movie rather than building the paths through it.
+    """
+    used = set()
+    paths = all_shortest_paths(source, target, used if distinct_movies else None)
+    for path in islice(paths, k):
+        yield path
+        if distinct_movies:
+            used.update(movie_id for movie_id, _ in path)
+
+
+def layer_distances(source, target=None, limit=None):
+    """
+    Returns a dict of BFS distances from the source index, stopping after
+    the layer that reaches the target index or after limit layers.
+    """
+    distances = {source: 0}
+    layer = [source]
+    steps = 0
+    while layer and target not in distances and (limit is None or steps < limit):
+        steps += 1
+        next_layer = []
+        for node in layer:
+            for _, person in graph.neighbors(node):
+                if person not in distances:
+                    distances[person] = steps
+                    next_layer.append(person)
+        layer = next_layer
+    return distances
+
+
+def bfs_tree(source, targets=None):
+    """
+    Runs one BFS from the source index and returns its tree as a pair of
+    arrays (parent person, parent movie), with -1 for people not reached.
+
+    If targets is given, stops as soon as every target index has been reached.
+    """
+    parent_person = array("i", [-1]) * len(graph.person_ids)
+    parent_movie = array("i", [-1]) * len(graph.person_ids)
+    parent_person[source] = source
+    remaining = None if targets is None else set(targets) - {source}
+
+    queue = deque([source])
+    while queue and remaining != set():
+        node = queue.popleft()
+        for movie, person in graph.neighbors(node):
+            if parent_person[person] == -1:
+                parent_person[person] = node
+                parent_movie[person] = movie
+                queue.append(person)
+                if remaining is not None:
+                    remaining.discard(person)
+    return parent_person, parent_movie
+
+
+def tree_route(tree, target):
+    """
+    Returns the (movie, person) index pairs from the root of a bfs_tree
+    to the target index, or None if the tree never reached it.
+    """
+    parent_person, parent_movie = tree
+    if parent_person[target] == -1:
+        return None
+    route = []
+    while parent_person[target] != target:
+        route.append((parent_movie[target], target))
+        target = parent_person[target]
+    route.reverse()
+    return route
+
+
+def to_ids(route):
+    """
+    Converts a route of (movie, person) index pairs to (movie_id, person_id) pairs.
+    """
+    if route is None:
+        return None
+    return [(graph.movie_ids[movie], graph.person_ids[person]) for movie, person in route]
+
+
+def trace_route(node):
+    """
+    Returns the (action, state) pairs from node up to the root of its tree,
+    nearest first.
+    """
+    route = []  # the list of tuples to return
+    while node.parent is not None:  # add the node and go up in the tree
+        route.append((node.action, node.state))
+        node = node.parent
+    return route
+
+
+def depth(node):
+    """
+    Returns how many steps node is from the root of its tree.
+    """
+    steps = 0
+    while node.parent is not None:
+        steps += 1
+        node = node.parent
+    return steps
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    candidates = names.exact(name)
+    person_ids = [candidate["id"] for candidate in candidates]
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+        for candidate in candidates:
+            person_id = candidate["id"]
+            name = candidate["name"]
+            birth = candidate["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -152,16 +404,38 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def resolve(person):
+    """
+    Returns the index of a person given by IMDB id or unambiguous name.
+    Raises LookupError with a message saying why if there is no such person.
+    """
+    index = graph.person_index(person)
+    if index is not None:
+        return index
+    matches = graph.people_named(person)
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        ids = ", ".join(graph.person_ids[match] for match in matches)
+        raise LookupError(f"ambiguous name '{person}' (ids: {ids})")
+    raise LookupError(f"person not found: '{person}'")
+
+
+def search_names(query, limit=10):
+    """
+    Returns up to limit ranked name candidates for query.
+    """
+    return names.search(query, limit)
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie, person in graph.neighbors(graph.person_index(person_id)):
+        neighbors.add((graph.movie_ids[movie], graph.person_ids[person]))
     return neighbors
 
 
@@ -0,0 +1,296 @@
+import csv
+from array import array
+from bisect import bisect_left, bisect_right
+
+import ingest
+
+
+class StringTable():
+    """
+    Strings packed back to back into one UTF-8 buffer and addressed by index,
+    so a million names cost one buffer plus one offset each instead of a
+    million str objects.
+    """
+
+    def __init__(self, data=None, offsets=None):
+        self.data = bytearray() if data is None else data
+        self.offsets = array("q", [0]) if offsets is None else offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+
+    def append(self, string):
+        """Adds string to the end of the table and returns its index."""
+        self.data += string.encode("utf-8")
+        self.offsets.append(len(self.data))
+        return len(self) - 1
+
+
+class Adjacency():
+    """
+    Compressed sparse rows: the neighbors of row r are
+    targets[offsets[r]:offsets[r + 1]].
+    """
+
+    def __init__(self, offsets=None, targets=None):
+        self.offsets = array("q", [0]) if offsets is None else offsets
+        self.targets = array("i") if targets is None else targets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        return self.targets[self.offsets[row]:self.offsets[row + 1]]
+
+    @classmethod
+    def from_pairs(cls, rows, sources, targets):
+        """
+        Builds the rows of a graph with the given number of rows from two
+        parallel arrays of edge endpoints, using a counting sort.
+        """
+        offsets = array("q", bytes(8 * (rows + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for row in range(rows):
+            offsets[row + 1] += offsets[row]
+
+        # next free slot in each row
+        fill = array("q", offsets[:-1])
+        packed = array("i", bytes(4 * len(targets)))
+        for source, target in zip(sources, targets):
+            packed[fill[source]] = target
+            fill[source] += 1
+        return cls(offsets, packed)
+
+
+class Graph():
+    """
+    People and movies interned to dense ints, with person -> movies,
+    movie -> stars and the projected person -> co-stars graph kept as
+    compressed sparse rows.
+    """
+
+    # attribute names of every buffer-backed member, by kind
+    TABLES = ("person_ids", "person_names", "person_births",
+              "movie_ids", "movie_titles", "movie_years")
+    ARRAYS = ("person_order", "movie_order", "name_order", "costar_movies")
+    ADJACENCIES = ("person_movies", "movie_stars", "costars")
+
+    def __init__(self):
+        # person index -> IMDB id, name and birth year
+        self.person_ids = StringTable()
+        self.person_names = StringTable()
+        self.person_births = StringTable()
+
+        # movie index -> IMDB id, title and year
+        self.movie_ids = StringTable()
+        self.movie_titles = StringTable()
+        self.movie_years = StringTable()
+
+        # indices sorted by IMDB id, and people sorted by lowercase name, for bisect lookups
+        self.person_order = array("i")
+        self.movie_order = array("i")
+        self.name_order = array("i")
+
+        self.person_movies = Adjacency()
+        self.movie_stars = Adjacency()
+
+        # each co-star once per person, with one movie they share at the same position
+        self.costars = Adjacency()
+        self.costar_movies = array("i")
+
+        # stars added since the rows above were built: person -> movies,
+        # movie -> people and person -> {co-star: movie}
+        self.extra_movies = {}
+        self.extra_stars = {}
+        self.extra_costars = {}
+
+    def load_csv(self, directory, report=None, chunk_size=ingest.CHUNK_SIZE):
+        """
+        Load people.csv, movies.csv and stars.csv from directory,
+        streaming them in chunks and dropping rows that fail validation.
+
+        Calls report(stats) after every chunk if given, and returns
+        the ingest.FileStats of the three files.
+        """
+        stats, star_people, star_movies = ingest.ingest(self, directory, report, chunk_size)
+        self.person_movies = Adjacency.from_pairs(len(self.person_ids), star_people, star_movies)
+        self.movie_stars = Adjacency.from_pairs(len(self.movie_ids), star_movies, star_people)
+        self.project()
+        return stats
+
+    def project(self):
+        """
+        Builds the co-star rows from person_movies and movie_stars,
+        keeping the first movie found for each pair of people.
+        """
+        offsets = array("q", [0])
+        costars = array("i")
+        costar_movies = array("i")
+        for person in range(len(self.person_ids)):
+            seen = {person: None}
+            for movie in self.person_movies[person]:
+                for costar in self.movie_stars[movie]:
+                    if costar not in seen:
+                        seen[costar] = movie
+                        costars.append(costar)
+                        costar_movies.append(movie)
+            offsets.append(len(costars))
+        self.costars = Adjacency(offsets, costars)
+        self.costar_movies = costar_movies
+
+    def movies_of(self, person):
+        """Returns the movie indices the person starred in."""
+        return list(self.person_movies[person]) + self.extra_movies.get(person, [])
+
+    def stars_of(self, movie):
+        """Returns the person indices who starred in the movie."""
+        return list(self.movie_stars[movie]) + self.extra_stars.get(movie, [])
+
+    def add_star(self, person, movie):
+        """
+        Records that the person index starred in the movie index without
+        rebuilding any rows. Returns False if that was already known.
+        """
+        if movie in self.movies_of(person):
+            return False
+        for costar in self.stars_of(movie):
+            if costar != person and self.shared_movie(person, costar) is None:
+                self.extra_costars.setdefault(person, {})[costar] = movie
+                self.extra_costars.setdefault(costar, {})[person] = movie
+        self.extra_movies.setdefault(person, []).append(movie)
+        self.extra_stars.setdefault(movie, []).append(person)
+        return True
+
+    def append_stars_csv(self, path, offset, stats=None):
+        """
+        Adds the stars.csv rows written after byte offset, skipping rows
+        that are malformed or name an unknown person or movie, and counting
+        them in stats (an ingest.FileStats) if given.
+
+        Returns the offset to pass next time, which stops at the last
+        complete line so a half written row is picked up on the next call.
+        """
+        if stats is None:
+            stats = ingest.FileStats(path)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        data = data[:data.rfind(b"\n") + 1]
+        lines = data.decode("utf-8").splitlines()
+        if offset == 0:
+            lines = lines[1:]
+        for row in csv.reader(lines):
+            stats.rows += 1
+            if len(row) != 2:
+                stats.drop("malformed")
+                continue
+            person = self.person_index(row[0])
+            movie = self.movie_index(row[1])
+            if person is None:
+                stats.drop("unknown person_id")
+            elif movie is None:
+                stats.drop("unknown movie_id")
+            else:
+                self.add_star(person, movie)
+                stats.kept += 1
+        stats.tick()
+        return offset + len(data)
+
+    def shared_movie(self, person, costar):
+        """
+        Returns the movie index the co-stars edge between two people
+        goes through, or None if they never starred together.
+        """
+        row = self.costars[person]
+        start = self.costars.offsets[person]
+        for position, other in enumerate(row):
+            if other == costar:
+                return self.costar_movies[start + position]
+        return self.extra_costars.get(person, {}).get(costar)
+
+    def buffers(self):
+        """
+        Returns every buffer backing the graph, keyed by a stable name.
+        """
+        buffers = {}
+        for name in self.TABLES:
+            table = getattr(self, name)
+            buffers[f"{name}.data"] = table.data
+            buffers[f"{name}.offsets"] = table.offsets
+        for name in self.ARRAYS:
+            buffers[name] = getattr(self, name)
+        for name in self.ADJACENCIES:
+            adjacency = getattr(self, name)
+            buffers[f"{name}.offsets"] = adjacency.offsets
+            buffers[f"{name}.targets"] = adjacency.targets
+        return buffers
+
+    def restore(self, buffers):
+        """
+        Points the graph at buffers shaped like the ones buffers() returns,
+        such as typed memoryviews over a snapshot.
+        """
+        for name in self.TABLES:
+            setattr(self, name, StringTable(buffers[f"{name}.data"], buffers[f"{name}.offsets"]))
+        for name in self.ARRAYS:
+            setattr(self, name, buffers[name])
+        for name in self.ADJACENCIES:
+            setattr(self, name, Adjacency(buffers[f"{name}.offsets"], buffers[f"{name}.targets"]))
+
+    def index(self):
+        """
+        Rebuilds the sorted lookup orders from the string tables.
+        """
+        ids = self.person_ids
+        self.person_order = array("i", sorted(range(len(ids)), key=ids.__getitem__))
+        ids = self.movie_ids
+        self.movie_order = array("i", sorted(range(len(ids)), key=ids.__getitem__))
+        self.name_order = array("i", sorted(range(len(self.person_names)), key=self.name_key))
+
+    def name_key(self, person):
+        return self.person_names[person].lower()
+
+    def person_index(self, person_id):
+        """
+        Returns the index of the person with the given IMDB id, or None.
+        """
+        return self.lookup(self.person_order, self.person_ids, person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of the movie with the given IMDB id, or None.
+        """
+        return self.lookup(self.movie_order, self.movie_ids, movie_id)
+
+    @staticmethod
+    def lookup(order, ids, key):
+        position = bisect_left(order, key, key=ids.__getitem__)
+        if position < len(order) and ids[order[position]] == key:
+            return order[position]
+        return None
+
+    def people_named(self, name):
+        """
+        Returns the indices of every person whose name matches, ignoring case.
+        """
+        name = name.lower()
+        start = bisect_left(self.name_order, name, key=self.name_key)
+        end = bisect_right(self.name_order, name, lo=start, key=self.name_key)
+        return sorted(self.name_order[start:end])
+
+    def neighbors(self, person):
+        """
+        Yields one (movie, person) index pair for each person who starred
+        with the given person.
+        """
+        start = self.costars.offsets[person]
+        end = self.costars.offsets[person + 1]
+        yield from zip(self.costar_movies[start:end], self.costars.targets[start:end])
+        extra = self.extra_costars.get(person)
+        if extra:
+            for costar, movie in extra.items():
+                yield movie, costar
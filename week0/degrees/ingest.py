@@ -0,0 +1,220 @@
+"""
+Streaming ingestion of a degrees dataset into a Graph.
+
+Rows are read in fixed size chunks with csv.reader, so beyond the graph
+itself only one chunk and arrays of id hashes are held in memory: stars.csv
+is joined through those rather than through maps holding every id as a str.
+Rows that are malformed, repeat an id or reference an unknown person or
+movie are dropped and counted.
+
+Usage: python ingest.py [directory]
+"""
+import csv
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+CHUNK_SIZE = 10_000
+
+# Graph tables with one row per person and per movie, ids first
+PEOPLE = ("person_ids", "person_names", "person_births")
+MOVIES = ("movie_ids", "movie_titles", "movie_years")
+
+
+class FileStats():
+    """Counts of what happened to the rows of one CSV file."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.kept = 0
+        # reason -> rows dropped for it
+        self.dropped = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def drop(self, reason):
+        self.dropped[reason] = self.dropped.get(reason, 0) + 1
+
+    def tick(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def rate(self):
+        """Returns rows read per second so far."""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        dropped = sum(self.dropped.values())
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.dropped.items()))
+        summary = f"{self.name}: {self.rows} rows, {self.kept} kept, {dropped} dropped"
+        if reasons:
+            summary += f" ({reasons})"
+        return f"{summary}, {self.rate():,.0f} rows/sec"
+
+
+def report(stats):
+    """Prints the progress of one file to stderr, as a report callback."""
+    print(stats, file=sys.stderr)
+
+
+def chunks(path, columns, stats, chunk_size):
+    """
+    Yields lists of up to chunk_size rows from a CSV file whose header
+    must start with the given columns. Rows with the wrong number of
+    fields are dropped as malformed.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None or tuple(header[:len(columns)]) != columns:
+            raise ValueError(f"{path}: expected columns {', '.join(columns)}, got {header}")
+        width = len(header)
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            stats.rows += len(rows)
+            valid = []
+            for row in rows:
+                if len(row) == width:
+                    valid.append(row)
+                else:
+                    stats.drop("malformed")
+            yield valid
+
+
+class IdIndex():
+    """
+    Finds the index of an id in a string table through the ids' hashes,
+    sorted into an array: 12 bytes per id instead of a str key in a dict,
+    and one string decode per lookup instead of one per bisect step.
+    """
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.order = array("i", sorted(range(len(ids)), key=lambda index: hash(ids[index])))
+        self.hashes = array("q", (hash(ids[index]) for index in self.order))
+
+    def get(self, key):
+        """Returns the index of key, or None."""
+        digest = hash(key)
+        position = bisect_left(self.hashes, digest)
+        while position < len(self.hashes) and self.hashes[position] == digest:
+            if self.ids[self.order[position]] == key:
+                return self.order[position]
+            position += 1
+        return None
+
+
+def duplicates(order, ids):
+    """
+    Returns the set of indices whose id an earlier index already has,
+    given the indices in order sorted stably by id.
+    """
+    repeats = set()
+    for previous, index in zip(order, order[1:]):
+        if ids[index] == ids[previous]:
+            repeats.add(index)
+    return repeats
+
+
+def without(table, drop):
+    """
+    Returns a copy of a graph.StringTable leaving out the indices in drop.
+    """
+    copy = type(table)()
+    for index in range(len(table)):
+        if index not in drop:
+            copy.append(table[index])
+    return copy
+
+
+def ingest(graph, directory, report=None, chunk_size=CHUNK_SIZE):
+    """
+    Streams people.csv, movies.csv and stars.csv from directory into an
+    empty graph and indexes it, calling report(stats) after every chunk
+    if given.
+
+    Returns the FileStats of the three files and two parallel arrays
+    holding the person and movie index of every kept star row.
+    """
+    def progress(stats):
+        stats.tick()
+        if report is not None:
+            report(stats)
+
+    if len(graph.person_ids) or len(graph.movie_ids):
+        # appending would leave the old people and movies shadowing the new ones
+        raise ValueError("can only ingest into an empty graph")
+
+    people = FileStats("people.csv")
+    for rows in chunks(f"{directory}/people.csv", ("id", "name", "birth"), people, chunk_size):
+        for person_id, name, birth, *_ in rows:
+            graph.person_ids.append(person_id)
+            graph.person_names.append(name)
+            graph.person_births.append(birth)
+            people.kept += 1
+        progress(people)
+
+    movies = FileStats("movies.csv")
+    for rows in chunks(f"{directory}/movies.csv", ("id", "title", "year"), movies, chunk_size):
+        for movie_id, title, year, *_ in rows:
+            graph.movie_ids.append(movie_id)
+            graph.movie_titles.append(title)
+            graph.movie_years.append(year)
+            movies.kept += 1
+        progress(movies)
+
+    # repeated ids sit next to each other in the graph's sorted id orders
+    graph.index()
+    dropped = False
+    for stats, order, names in ((people, graph.person_order, PEOPLE),
+                                (movies, graph.movie_order, MOVIES)):
+        repeats = duplicates(order, getattr(graph, names[0]))
+        if repeats:
+            for name in names:
+                setattr(graph, name, without(getattr(graph, name), repeats))
+            stats.dropped["duplicate id"] = len(repeats)
+            stats.kept -= len(repeats)
+            dropped = True
+    if dropped:
+        graph.index()
+
+    # stars are joined through arrays of hashes, not id -> index dicts
+    person_index = IdIndex(graph.person_ids)
+    movie_index = IdIndex(graph.movie_ids)
+    star_people = array("i")
+    star_movies = array("i")
+    stars = FileStats("stars.csv")
+    for rows in chunks(f"{directory}/stars.csv", ("person_id", "movie_id"), stars, chunk_size):
+        for person_id, movie_id, *_ in rows:
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is None:
+                stars.drop("unknown person_id")
+            elif movie is None:
+                stars.drop("unknown movie_id")
+            else:
+                star_people.append(person)
+                star_movies.append(movie)
+                stars.kept += 1
+        progress(stars)
+
+    return [people, movies, stars], star_people, star_movies
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python ingest.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "small"
+
+    from graph import Graph
+    graph = Graph()
+    for stats in graph.load_csv(directory, report=report):
+        print(stats)
+
+
+if __name__ == "__main__":
+    main()
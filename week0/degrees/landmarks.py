@@ -0,0 +1,93 @@
+import math
+from array import array
+from collections import deque
+
+# distance stored for people a landmark never reaches
+UNREACHABLE = 0xFFFF
+
+
+class LandmarkIndex():
+    """
+    BFS distances from a few well connected landmark people to everyone,
+    which bound the degrees between any two people by the triangle inequality:
+
+        |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+    """
+
+    def __init__(self, graph, k=16):
+        self.graph = graph
+        self.landmarks = self.choose(graph, k)
+        self.distances = [self.distances_from(graph, landmark) for landmark in self.landmarks]
+
+    @staticmethod
+    def choose(graph, k):
+        """
+        Returns the k people with the most co-stars, highest first.
+        """
+        offsets = graph.costars.offsets
+        counts = []
+        for person in range(len(graph.person_ids)):
+            counts.append((offsets[person] - offsets[person + 1], person))
+        counts.sort()
+        return [person for _, person in counts[:k]]
+
+    @staticmethod
+    def distances_from(graph, source):
+        """
+        Returns an array of BFS distances from the source index to every person.
+        """
+        distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            step = distances[node] + 1
+            for _, person in graph.neighbors(node):
+                if distances[person] == UNREACHABLE:
+                    distances[person] = step
+                    queue.append(person)
+        return distances
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees between two person indices.
+
+        Both are math.inf when a landmark proves the two are not connected;
+        upper is math.inf when no landmark reaches either of them.
+        """
+        lower = 0
+        upper = math.inf
+        for distances in self.distances:
+            from_source = distances[source]
+            from_target = distances[target]
+            if from_source == UNREACHABLE and from_target == UNREACHABLE:
+                continue
+            if from_source == UNREACHABLE or from_target == UNREACHABLE:
+                return math.inf, math.inf
+            lower = max(lower, abs(from_source - from_target))
+            upper = min(upper, from_source + from_target)
+        return lower, upper
+
+    def degree_bounds(self, source_id, target_id):
+        """
+        Returns (lower, upper) bounds on the degrees between two IMDB person ids.
+        """
+        return self.bounds(self.graph.person_index(source_id), self.graph.person_index(target_id))
+
+    def heuristic(self, target):
+        """
+        Returns an admissible, consistent A* heuristic estimating the degrees
+        from any person index to the target index.
+        """
+        pairs = [(distances, distances[target]) for distances in self.distances
+                 if distances[target] != UNREACHABLE]
+
+        def estimate(person):
+            best = 0
+            for distances, from_target in pairs:
+                from_person = distances[person]
+                if from_person != UNREACHABLE and abs(from_person - from_target) > best:
+                    best = abs(from_person - from_target)
+            return best
+
+        return estimate
@@ -0,0 +1,112 @@
+import heapq
+from array import array
+from bisect import bisect_left
+
+
+class NameIndex():
+    """
+    Non-interactive name search over a Graph: exact and prefix matches
+    bisect the graph's name order, fuzzy matches rank people by the
+    trigrams their names share with the query.
+    """
+
+    def __init__(self, graph, max_postings=50_000):
+        self.graph = graph
+        # trigrams this common say little about a name and cost the most to count
+        self.max_postings = max_postings
+        # trigram -> array of person indices whose name contains it,
+        # built on the first fuzzy search
+        self.trigrams = None
+
+    def build(self):
+        """
+        Indexes the trigrams of every name in the graph.
+        """
+        postings = {}
+        for person in range(len(self.graph.person_names)):
+            for trigram in self.trigrams_of(self.graph.person_names[person]):
+                postings.setdefault(trigram, []).append(person)
+        self.trigrams = {trigram: array("i", people) for trigram, people in postings.items()}
+
+    @staticmethod
+    def trigrams_of(name):
+        """Returns the set of trigrams of a lowercased name padded with spaces."""
+        padded = f"  {' '.join(name.lower().split())} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def candidate(self, person, score=1.0):
+        return {
+            "id": self.graph.person_ids[person],
+            "name": self.graph.person_names[person],
+            "birth": self.graph.person_births[person],
+            "score": score,
+        }
+
+    def exact(self, name):
+        """
+        Returns a candidate for every person with exactly this name, ignoring case.
+        """
+        return [self.candidate(person) for person in self.graph.people_named(name)]
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit candidates whose names start with prefix,
+        ignoring case, in name order.
+        """
+        graph = self.graph
+        prefix = prefix.lower()
+        order = graph.name_order
+        position = bisect_left(order, prefix, key=graph.name_key)
+        results = []
+        while position < len(order) and len(results) < limit:
+            person = order[position]
+            if not graph.name_key(person).startswith(prefix):
+                break
+            name = graph.person_names[person]
+            score = len(prefix) / len(name) if name else 1.0
+            results.append(self.candidate(person, round(score, 4)))
+            position += 1
+        return results
+
+    def fuzzy(self, query, limit=10):
+        """
+        Returns up to limit candidates ranked by trigram similarity
+        (Dice coefficient) to query, best first.
+        """
+        if self.trigrams is None:
+            self.build()
+        wanted = self.trigrams_of(query)
+        postings = [self.trigrams[trigram] for trigram in wanted if trigram in self.trigrams]
+        selective = [people for people in postings if len(people) <= self.max_postings]
+        # fall back to every posting rather than matching nothing
+        shared = {}
+        for people in selective or postings:
+            for person in people:
+                shared[person] = shared.get(person, 0) + 1
+
+        # only the people sharing the most trigrams can have the best scores
+        best = heapq.nlargest(10 * limit, shared.items(), key=lambda item: (item[1], -item[0]))
+        scored = []
+        for person, count in best:
+            size = len(self.trigrams_of(self.graph.person_names[person]))
+            scored.append((-2 * count / (len(wanted) + size), person))
+        scored.sort()
+        return [self.candidate(person, round(-score, 4)) for score, person in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """
+        Returns ranked candidates for query: exact matches, then prefix
+        matches, then fuzzy matches, without duplicates. Each kind is only
+        searched while fewer than limit candidates have been found.
+        """
+        results = []
+        seen = set()
+        for search in (self.exact, lambda query: self.prefix(query, limit),
+                       lambda query: self.fuzzy(query, limit)):
+            if len(results) >= limit:
+                break
+            for candidate in search(query):
+                if len(results) < limit and candidate["id"] not in seen:
+                    seen.add(candidate["id"])
+                    results.append(candidate)
+        return results
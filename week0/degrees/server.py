@@ -0,0 +1,197 @@
+"""
+Local HTTP/JSON server answering degrees queries from a graph loaded once.
+
+    GET /path?source=...&target=...   people as IMDB ids or exact names
+    GET /names?q=...&limit=...        ranked name candidates
+
+Searches run in an executor so the event loop keeps accepting requests,
+and paths are kept in an LRU cache with a time to live.
+
+Usage: python server.py [--host H] [--port P] [--cache-size N] [--ttl S] [--workers N] directory
+"""
+import argparse
+import asyncio
+import json
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+from batch import start_worker
+from degrees import graph
+
+
+def reverse_route(source, path):
+    """
+    Returns the path from the end of a (movie_id, person_id) route
+    back to its source.
+    """
+    people = [source] + [person_id for _, person_id in path]
+    movies = [movie_id for movie_id, _ in path]
+    return [(movies[i], people[i]) for i in reversed(range(len(path)))]
+
+
+class PathCache():
+    """
+    Least recently used cache of shortest paths keyed on (source, target)
+    person ids, whose entries expire ttl seconds after they were stored.
+    A path cached in one direction also answers the other, reversed.
+    """
+
+    def __init__(self, size=10_000, ttl=3600):
+        self.size = size
+        self.ttl = ttl
+        # (source, target) -> (expiry time, path or None)
+        self.entries = OrderedDict()
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, entry[1]
+
+    def get(self, source, target):
+        """
+        Returns (hit, path) for a query, where path may be None for a
+        cached "not connected" answer.
+        """
+        hit, path = self.lookup((source, target))
+        if hit:
+            return hit, path
+        hit, path = self.lookup((target, source))
+        if hit and path is not None:
+            path = reverse_route(target, path)
+        return hit, path
+
+    def put(self, source, target, path):
+        self.entries[(source, target)] = (time.monotonic() + self.ttl, path)
+        self.entries.move_to_end((source, target))
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+
+class Server():
+
+    def __init__(self, executor, cache):
+        self.executor = executor
+        self.cache = cache
+
+    async def find_path(self, params):
+        try:
+            source = degrees.resolve(params.get("source", ""))
+            target = degrees.resolve(params.get("target", ""))
+        except LookupError as error:
+            return HTTPStatus.NOT_FOUND, {"error": str(error)}
+        source = graph.person_ids[source]
+        target = graph.person_ids[target]
+
+        cached, path = self.cache.get(source, target)
+        if not cached:
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(self.executor, degrees.shortest_path, source, target)
+            self.cache.put(source, target, path)
+        return HTTPStatus.OK, {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path,
+            "cached": cached,
+        }
+
+    async def find_names(self, params):
+        try:
+            limit = int(params.get("limit", 10))
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "limit must be an integer"}
+        loop = asyncio.get_running_loop()
+        candidates = await loop.run_in_executor(self.executor, degrees.search_names,
+                                                params.get("q", ""), limit)
+        return HTTPStatus.OK, {"candidates": candidates}
+
+    async def route(self, method, target):
+        if method != "GET":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "only GET is supported"}
+        url = urlsplit(target)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/path":
+            return await self.find_path(params)
+        if url.path == "/names":
+            return await self.find_names(params)
+        return HTTPStatus.NOT_FOUND, {"error": f"no such endpoint: {url.path}"}
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            # skip the headers, nothing here needs them
+            while (await reader.readline()).strip():
+                pass
+            try:
+                method, target, _ = request.decode("latin-1").split()
+            except ValueError:
+                status, body = HTTPStatus.BAD_REQUEST, {"error": "malformed request line"}
+            else:
+                try:
+                    status, body = await self.route(method, target)
+                except Exception as error:
+                    traceback.print_exc()
+                    status = HTTPStatus.INTERNAL_SERVER_ERROR
+                    body = {"error": f"{type(error).__name__}: {error}"}
+
+            payload = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(host, port, executor, cache):
+    server = Server(executor, cache)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    parser.add_argument("--ttl", type=float, default=3600, help="seconds a cached path stays valid")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="search processes sharing the snapshot (default 0, one thread)")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    # fuzzy name search needs the trigram index, build it before serving
+    degrees.names.build()
+    print("Data loaded.")
+
+    if args.workers > 0:
+        executor = ProcessPoolExecutor(args.workers, initializer=start_worker,
+                                       initargs=(args.directory,))
+    else:
+        executor = ThreadPoolExecutor(1)
+    with executor:
+        try:
+            asyncio.run(serve(args.host, args.port, executor, PathCache(args.cache_size, args.ttl)))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
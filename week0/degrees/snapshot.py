@@ -0,0 +1,134 @@
+"""
+Binary snapshots of a degrees dataset, written next to its CSVs and
+memory-mapped on later runs instead of re-parsing them.
+
+Usage: python snapshot.py [directory]
+"""
+import mmap
+import os
+import struct
+import sys
+
+import ingest
+from graph import Graph
+
+FILENAME = "degrees.snapshot"
+MAGIC = b"DEGSNAP\0"
+VERSION = 2
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# magic, version, section count, then (mtime_ns, size) of each source CSV
+HEADER = struct.Struct(f"=8sII{2 * len(SOURCES)}q")
+# name, typecode, byte offset, byte length
+SECTION = struct.Struct("=32sc6xqq")
+ALIGNMENT = 8
+
+
+def path_for(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def stamp(directory):
+    """
+    Returns the (mtime_ns, size) of every source CSV, flattened,
+    so a snapshot can tell whether it is still current.
+    """
+    values = []
+    for source in SOURCES:
+        stat = os.stat(os.path.join(directory, source))
+        values += [stat.st_mtime_ns, stat.st_size]
+    return values
+
+
+def write(graph, directory):
+    """
+    Writes graph to the snapshot file in directory, replacing any old one.
+    """
+    buffers = graph.buffers()
+    position = HEADER.size + SECTION.size * len(buffers)
+    sections = []
+    for name, buffer in buffers.items():
+        view = memoryview(buffer)
+        position += -position % ALIGNMENT
+        sections.append((name, view, position))
+        position += view.nbytes
+
+    path = path_for(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sections), *stamp(directory)))
+        for name, view, offset in sections:
+            f.write(SECTION.pack(name.encode(), view.format.encode(), offset, view.nbytes))
+        for name, view, offset in sections:
+            f.write(bytes(offset - f.tell()))
+            f.write(view)
+    os.replace(temporary, path)
+
+
+def read(graph, directory):
+    """
+    Points graph at a memory map of the snapshot in directory.
+
+    Returns False, leaving graph untouched, if there is no snapshot or it
+    was written by another version or from different CSVs.
+    """
+    try:
+        with open(path_for(directory), "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+
+    current = len(data) >= HEADER.size
+    if current:
+        magic, version, count, *values = HEADER.unpack_from(data)
+        current = magic == MAGIC and version == VERSION and values == stamp(directory)
+    if not current:
+        # unmap it before load replaces the file
+        data.close()
+        return False
+
+    view = memoryview(data)
+    buffers = {}
+    for i in range(count):
+        name, typecode, offset, length = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+        buffers[name.rstrip(b"\0").decode()] = view[offset:offset + length].cast(typecode.decode())
+    graph.restore(buffers)
+    return True
+
+
+def build(graph, directory):
+    """
+    Loads the CSVs of directory into graph, printing progress and
+    then the rows kept and dropped in each file to stderr.
+    """
+    for stats in graph.load_csv(directory, report=ingest.report):
+        print(f"Loaded {stats}", file=sys.stderr)
+
+
+def load(graph, directory):
+    """
+    Loads directory into graph from its snapshot, building the snapshot
+    from the CSVs first if it is missing or stale.
+    """
+    if read(graph, directory):
+        return
+    build(graph, directory)
+    try:
+        write(graph, directory)
+    except OSError:
+        # a read-only dataset still loads, just without the cache
+        pass
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python snapshot.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "small"
+    graph = Graph()
+    build(graph, directory)
+    write(graph, directory)
+    print(f"Wrote {path_for(directory)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Headless benchmark of tictactoe.minimax across its search strategies.
+
+For each strategy it plays self-play games from random openings, games
+against a random player and a sweep over every reachable position, and reports nodes/sec, per-move
+latency percentiles and peak traced memory as JSON.
+
+Usage: python benchmark.py [--strategy NAME ...] [--games N] [--seed N] [--output PATH]
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import bitboard
+import tictactoe as ttt
+
+# Random moves that open every self-play game
+OPENING = 2
+
+
+def clear_caches():
+    """Empties every table the strategies memoize into, so each run starts cold."""
+    ttt.transposition_table.clear()
+    bitboard.table.clear()
+
+
+def timed_move(board, strategy, moves):
+    """Asks minimax for a move, recording (seconds, nodes) in moves."""
+    start = time.perf_counter()
+    action = ttt.minimax(board, strategy)
+    moves.append((time.perf_counter() - start, ttt.stats["nodes"]))
+    return action
+
+
+def self_play(strategy, games, rng, moves):
+    """
+    Plays games where minimax moves for both sides after OPENING random
+    moves, so the games differ; returns the outcomes.
+    """
+    outcomes = []
+    for _ in range(games):
+        board = ttt.initial_state()
+        for _ in range(OPENING):
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+        while not ttt.terminal(board):
+            board = ttt.result(board, timed_move(board, strategy, moves))
+        outcomes.append(ttt.utility(board))
+    return outcomes
+
+
+def random_play(strategy, games, rng, moves):
+    """
+    Plays games against a uniformly random opponent, which takes X in
+    even games and O in odd ones; returns the outcomes.
+    """
+    outcomes = []
+    for game in range(games):
+        randomizer = ttt.X if game % 2 == 0 else ttt.O
+        board = ttt.initial_state()
+        while not ttt.terminal(board):
+            if ttt.player(board) == randomizer:
+                action = rng.choice(sorted(ttt.actions(board)))
+            else:
+                action = timed_move(board, strategy, moves)
+            board = ttt.result(board, action)
+        outcomes.append(ttt.utility(board))
+    return outcomes
+
+
+def reachable():
+    """Returns every non-terminal position reachable from the empty board."""
+    seen = {}
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key = tuple(cell for row in board for cell in row)
+        if key in seen or ttt.terminal(board):
+            continue
+        seen[key] = board
+        frontier.extend(ttt.result(board, action) for action in ttt.actions(board))
+    return list(seen.values())
+
+
+def sweep(strategy, positions, moves):
+    """Asks minimax for a move in each of positions."""
+    for board in positions:
+        timed_move(board, strategy, moves)
+    return []
+
+
+PHASES = ("self_play", "random", "sweep")
+
+
+def play(strategy, phase, games, seed, positions, moves):
+    """Runs one phase, recording every move in moves; returns the outcomes."""
+    if phase == "self_play":
+        return self_play(strategy, games, random.Random(seed), moves)
+    if phase == "random":
+        return random_play(strategy, games, random.Random(seed), moves)
+    return sweep(strategy, positions, moves)
+
+
+def percentile(values, fraction):
+    """Returns the nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summarize(moves, outcomes, seconds, peak):
+    latencies = sorted(latency for latency, _ in moves)
+    nodes = sum(count for _, count in moves)
+    search_seconds = sum(latencies)
+    summary = {
+        "moves": len(moves),
+        "nodes": nodes,
+        "seconds": round(seconds, 6),
+        "nodes_per_sec": round(nodes / search_seconds) if search_seconds else 0,
+        "latency_ms": {
+            name: round(1000 * percentile(latencies, fraction), 4)
+            for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+        },
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+    if outcomes:
+        summary["outcomes"] = {
+            "x_wins": outcomes.count(1),
+            "o_wins": outcomes.count(-1),
+            "draws": outcomes.count(0),
+        }
+    return summary
+
+
+def run(strategy, phase, games, seed, positions):
+    """
+    Runs one phase for one strategy from cold caches and returns its summary.
+    Timing and memory come from separate runs, as tracing slows everything down.
+    """
+    clear_caches()
+    moves = []
+    start = time.perf_counter()
+    outcomes = play(strategy, phase, games, seed, positions, moves)
+    seconds = time.perf_counter() - start
+
+    clear_caches()
+    tracemalloc.start()
+    play(strategy, phase, games, seed, positions, [])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(moves, outcomes, seconds, peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--strategy", nargs="+", choices=sorted(ttt.STRATEGIES),
+                        default=sorted(ttt.STRATEGIES))
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the JSON report to (default stdout)")
+    args = parser.parse_args()
+
+    positions = reachable()
+    report = {
+        "python": platform.python_version(),
+        "games": args.games,
+        "seed": args.seed,
+        "positions": len(positions),
+        "strategies": {
+            strategy: {phase: run(strategy, phase, args.games, args.seed, positions)
+                       for phase in PHASES}
+            for strategy in args.strategy
+        },
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A position is two 9-bit ints, one per player, where bit 3 * i + j is set
+if that player holds cell (i, j). Moves are a single OR and wins are table
+lookups, so search never copies a board.
+
+The functions named like the ones in tictactoe.py take and return the same
+nested-list boards, so runner.py can use this module in its place.
+"""
+X = "X"
+O = "O"
+EMPTY = None
+
+# every cell taken
+FULL = 0b111111111
+
+# rows, columns and diagonals as masks over the 9 cells
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# WINS[bits] is True if bits holds a whole line
+WINS = [any(bits & line == line for line in LINES) for bits in range(1 << 9)]
+
+# The 8 symmetries of the board as cell permutations: TRANSFORMS[t][cell]
+# is where transform t sends cell (the identity first)
+TRANSFORMS = [
+    [3 * i2 + j2 for i2, j2 in (move(i, j) for i in range(3) for j in range(3))]
+    for move in (
+        lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+        lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i),
+    )
+]
+
+# INVERSE[t] is the transform that undoes transform t
+INVERSE = [
+    TRANSFORMS.index(sorted(range(9), key=TRANSFORMS[t].__getitem__))
+    for t in range(len(TRANSFORMS))
+]
+
+# MAPPED[t][bits] is bits with every cell moved by transform t
+MAPPED = [
+    [sum(1 << cells[cell] for cell in range(9) if bits >> cell & 1) for bits in range(1 << 9)]
+    for cells in TRANSFORMS
+]
+
+# Negamax value of every position searched so far, for the side to move,
+# keyed by the canonical (side to move's bits, other side's bits)
+table = {}
+
+# Search counters, reset by every minimax call
+stats = {"nodes": 0}
+
+
+def encode(board):
+    """
+    Returns the (x, o) bitboards of a nested-list board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """
+    Returns the nested-list board of the (x, o) bitboards.
+    """
+    board = initial_state()
+    for cell in range(9):
+        if x >> cell & 1:
+            board[cell // 3][cell % 3] = X
+        elif o >> cell & 1:
+            board[cell // 3][cell % 3] = O
+    return board
+
+
+def canonical(first, second):
+    """
+    Returns (first, second, t): the smallest image of the pair of bitboards
+    under the board's symmetries, and the transform t that produced it.
+    """
+    return min((mapped[first], mapped[second], t) for t, mapped in enumerate(MAPPED))
+
+
+def negamax(me, them):
+    """
+    Returns 1 if the side to move (holding me) wins with best play,
+    -1 if it loses and 0 for a draw.
+    """
+    stats["nodes"] += 1
+    # rotations and reflections of a position share one entry
+    key = canonical(me, them)[:2]
+    if key in table:
+        return table[key]
+
+    if WINS[them]:
+        value = -1  # the move that got here won
+    elif me | them == FULL:
+        value = 0
+    else:
+        value = -1
+        free = FULL & ~(me | them)
+        while free and value < 1:
+            move = free & -free
+            free ^= move
+            value = max(value, -negamax(them, me | move))
+    table[key] = value
+    return value
+
+
+def best_action(x, o):
+    """
+    Returns the (i, j) of an optimal move for the side to move, or None
+    if the game is over.
+    """
+    if WINS[x] or WINS[o] or x | o == FULL:
+        return None
+    me, them = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+    # search the representative of the position's symmetry class
+    me, them, transform = canonical(me, them)
+
+    best_cell = None
+    best_value = -2
+    free = FULL & ~(me | them)
+    while free:
+        move = free & -free
+        free ^= move
+        value = -negamax(them, me | move)
+        if value > best_value:
+            best_value = value
+            best_cell = move.bit_length() - 1
+            if value == 1:
+                break
+    # map the move back onto the board as it was given
+    return divmod(TRANSFORMS[INVERSE[transform]][best_cell], 3)
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return [[EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY],
+            [EMPTY, EMPTY, EMPTY]]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = encode(board)
+    if WINS[x] or WINS[o] or x | o == FULL:
+        return None
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = encode(board)
+    return {divmod(cell, 3) for cell in range(9) if not (x | o) >> cell & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = encode(board)
+    move = 1 << (3 * action[0] + action[1])
+    if (x | o) & move:
+        raise Exception("Invalid action: Cell is not EMPTY")
+    if x.bit_count() == o.bit_count():
+        return decode(x | move, o)
+    return decode(x, o | move)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = encode(board)
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = encode(board)
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = encode(board)
+    return 1 if WINS[x] else -1 if WINS[o] else 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    stats["nodes"] = 0
+    return best_action(*encode(board))
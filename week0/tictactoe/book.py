@@ -0,0 +1,164 @@
+"""
+Perfect-play book for Tic Tac Toe
+
+Every position reachable from the empty board is solved once and stored in
+a 3 ** 9 byte table indexed by the board read as a base-3 number (EMPTY = 0,
+X = 1, O = 2, cell 3 * i + j worth 3 ** (3 * i + j)). Each byte holds the
+value of the position for X plus one in its high nibble and the best cell in
+its low nibble, or NO_MOVE for positions that are over or unreachable.
+
+Usage: python book.py [--verify]
+"""
+import os
+import sys
+
+import bitboard
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NO_MOVE = 0xFF
+SIZE = 3 ** 9
+
+# The loaded table, read from PATH the first time it is needed
+table = None
+
+
+def index(board):
+    """
+    Returns the base-3 table index of a nested-list board.
+    """
+    value = 0
+    for cell in range(8, -1, -1):
+        mark = board[cell // 3][cell % 3]
+        value = value * 3 + (1 if mark == bitboard.X else 2 if mark == bitboard.O else 0)
+    return value
+
+
+def solve():
+    """
+    Returns the book as bytes, solving every reachable position.
+    """
+    book = bytearray([NO_MOVE]) * SIZE
+    seen = set()
+    frontier = [(0, 0)]
+    while frontier:
+        x, o = frontier.pop()
+        if (x, o) in seen:
+            continue
+        seen.add((x, o))
+        action = bitboard.best_action(x, o)
+        if action is None:
+            continue
+
+        x_to_move = x.bit_count() == o.bit_count()
+        me, them = (x, o) if x_to_move else (o, x)
+        value = bitboard.negamax(me, them)
+        if not x_to_move:
+            value = -value
+        book[index(bitboard.decode(x, o))] = (value + 1) << 4 | (3 * action[0] + action[1])
+
+        free = bitboard.FULL & ~(x | o)
+        for cell in range(9):
+            if free >> cell & 1:
+                frontier.append((x | 1 << cell, o) if x_to_move else (x, o | 1 << cell))
+    return bytes(book)
+
+
+def write(path=PATH):
+    """
+    Solves the book and writes it to path.
+    """
+    book = solve()
+    with open(path, "wb") as f:
+        f.write(book)
+    return book
+
+
+def load(path=PATH):
+    """
+    Returns the book, reading it from path on first use and
+    generating it there if it does not exist yet.
+    """
+    global table
+    if table is None:
+        try:
+            with open(path, "rb") as f:
+                table = f.read()
+        except FileNotFoundError:
+            table = None
+        if table is None or len(table) != SIZE:
+            try:
+                table = write(path)
+            except OSError:
+                # a read-only install still gets the book, just not saved
+                table = solve()
+    return table
+
+
+def lookup(board):
+    """
+    Returns (value for X, (i, j) of the best move) for a board,
+    or None if the game is over.
+    """
+    entry = load()[index(board)]
+    if entry == NO_MOVE:
+        return None
+    return (entry >> 4) - 1, divmod(entry & 0xF, 3)
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    entry = lookup(board)
+    return None if entry is None else entry[1]
+
+
+def verify():
+    """
+    Checks the book against tictactoe's recursive search in every reachable
+    position: the book's value must match, and its move must keep it.
+
+    Returns the number of positions checked.
+    """
+    import tictactoe as ttt
+
+    def value(board):
+        if ttt.terminal(board):
+            return ttt.utility(board)
+        return ttt.max_value(board) if ttt.player(board) == ttt.X else ttt.min_value(board)
+
+    checked = 0
+    seen = set()
+    frontier = [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        key = index(board)
+        if key in seen:
+            continue
+        seen.add(key)
+        if ttt.terminal(board):
+            if lookup(board) is not None:
+                raise AssertionError(f"book has a move for finished board {board}")
+            continue
+
+        book_value, action = lookup(board)
+        if book_value != value(board):
+            raise AssertionError(f"book value {book_value} != search value {value(board)} for {board}")
+        if board[action[0]][action[1]] is not ttt.EMPTY or value(ttt.result(board, action)) != book_value:
+            raise AssertionError(f"book move {action} is not optimal for {board}")
+        checked += 1
+        frontier.extend(ttt.result(board, action) for action in ttt.actions(board))
+    return checked
+
+
+def main():
+    if len(sys.argv) > 2 or sys.argv[1:] not in ([], ["--verify"]):
+        sys.exit("Usage: python book.py [--verify]")
+    write()
+    print(f"Wrote {PATH}.")
+    if sys.argv[1:] == ["--verify"]:
+        print(f"Verified {verify()} positions against minimax.")
+
+
+if __name__ == "__main__":
+    main()
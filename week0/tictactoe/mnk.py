@@ -0,0 +1,250 @@
+"""
+m,n,k-game Player
+
+Tic Tac Toe generalized to boards of m rows and n columns, won by k in a row.
+Boards are nested lists like in tictactoe.py. Full minimax is out of reach
+past 3x3, so minimax here runs iterative deepening alpha-beta under a time
+budget and scores the positions where it stops with a heuristic.
+"""
+import time
+from functools import lru_cache
+
+from tictactoe import X, O, EMPTY
+
+# Scores beyond any heuristic value; a win found sooner scores higher
+WIN = 1_000_000
+
+# Search counters, reset by every minimax call
+stats = {"depth": 0, "nodes": 0}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Layout():
+    """
+    Precomputed lines of an m x n board with k in a row: every window of
+    k cells in a row, column or diagonal, by cell index i * n + j.
+    """
+
+    def __init__(self, m, n, k):
+        if not 0 < k <= max(m, n):
+            raise ValueError(f"cannot get {k} in a row on a {m}x{n} board")
+        self.m, self.n, self.k = m, n, k
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(tuple((i + di * s) * n + j + dj * s for s in range(k)))
+        # cell -> the windows it is part of
+        self.through = [[] for _ in range(m * n)]
+        for window in self.windows:
+            for cell in window:
+                self.through[cell].append(window)
+        # cells from the center outwards, the order moves are tried in
+        center_i, center_j = (m - 1) / 2, (n - 1) / 2
+        self.central = sorted(range(m * n), key=lambda c: abs(c // n - center_i) + abs(c % n - center_j))
+        # neighborhood of each cell, for only trying moves next to stones
+        self.around = [
+            [r * n + c for r in range(i - 1, i + 2) for c in range(j - 1, j + 2)
+             if 0 <= r < m and 0 <= c < n and (r, c) != (i, j)]
+            for i in range(m) for j in range(n)
+        ]
+
+    def wins_at(self, cells, cell):
+        """Returns True if the mark at cell completes a window through it."""
+        mark = cells[cell]
+        return any(all(cells[other] == mark for other in window) for window in self.through[cell])
+
+
+@lru_cache(maxsize=None)
+def layout(m, n, k):
+    return Layout(m, n, k)
+
+
+def layout_of(board, k):
+    return layout(len(board), len(board[0]), k)
+
+
+def initial_state(m=3, n=3):
+    """
+    Returns starting state of an m x n board.
+    """
+    return [[EMPTY] * n for _ in range(m)]
+
+
+def winner(board, k=3):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    cells = [cell for row in board for cell in row]
+    for window in layout_of(board, k).windows:
+        mark = cells[window[0]]
+        if mark is not EMPTY and all(cells[cell] == mark for cell in window):
+            return mark
+    return None
+
+
+def player(board, k=3):
+    """
+    Returns player who has the next turn on a board.
+    """
+    count_x = sum(row.count(X) for row in board)
+    count_o = sum(row.count(O) for row in board)
+    if winner(board, k) or count_x + count_o == len(board) * len(board[0]):
+        return None
+    return O if count_x > count_o else X
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(i, j) for i, row in enumerate(board) for j, cell in enumerate(row) if cell is EMPTY}
+
+
+def result(board, action, k=3):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if board[i][j] is not EMPTY:
+        raise Exception("Invalid action: Cell is not EMPTY")
+    after = [row[:] for row in board]
+    after[i][j] = player(board, k)
+    return after
+
+
+def terminal(board, k=3):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return winner(board, k) is not None or not actions(board)
+
+
+def utility(board, k=3):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    mark = winner(board, k)
+    return 1 if mark == X else -1 if mark == O else 0
+
+
+def evaluate(lines, cells, me):
+    """
+    Returns a heuristic score of cells for me: every window only one side
+    has stones in counts for that side, more the fuller it is.
+    """
+    score = 0
+    for window in lines.windows:
+        mine = theirs = 0
+        for cell in window:
+            mark = cells[cell]
+            if mark == me:
+                mine += 1
+            elif mark is not EMPTY:
+                theirs += 1
+        if mine and not theirs:
+            score += 10 ** mine
+        elif theirs and not mine:
+            score -= 10 ** theirs
+    return score
+
+
+def candidates(lines, cells, first=None):
+    """
+    Returns the empty cells worth trying, best guess first: the previous
+    best move, then the rest from the center outwards. On boards bigger
+    than 4x4 only cells next to a stone are tried.
+    """
+    moves = [cell for cell in lines.central if cells[cell] is EMPTY]
+    if len(cells) > 16:
+        near = [cell for cell in moves if any(cells[other] is not EMPTY for other in lines.around[cell])]
+        moves = near or moves[:1]
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    return moves
+
+
+def negamax(lines, cells, me, depth, ply, alpha, beta, empty, deadline, cancel=None):
+    """
+    Returns the score of cells for me, the side to move, searching depth
+    more plies with alpha-beta pruning.
+    """
+    stats["nodes"] += 1
+    if stats["nodes"] % 256 == 0 and (time.perf_counter() > deadline
+                                      or cancel is not None and cancel.is_set()):
+        raise SearchTimeout
+    if empty == 0:
+        return 0
+    if depth == 0:
+        return evaluate(lines, cells, me)
+
+    them = O if me == X else X
+    best = -WIN
+    for cell in candidates(lines, cells):
+        cells[cell] = me
+        if lines.wins_at(cells, cell):
+            score = WIN - ply
+        else:
+            score = -negamax(lines, cells, them, depth - 1, ply + 1, -beta, -alpha, empty - 1,
+                                  deadline, cancel)
+        cells[cell] = EMPTY
+        if score > best:
+            best = score
+        if best > alpha:
+            alpha = best
+        if alpha >= beta:
+            break
+    return best
+
+
+def minimax(board, k=3, time_budget=1.0, max_depth=None, cancel=None):
+    """
+    Returns a move (i, j) for the current player, searching one ply deeper
+    at a time until time_budget seconds run out or max_depth is reached,
+    and keeping the best move of the deepest search that finished.
+
+    cancel is an optional threading.Event that stops the search early
+    when set, as if the time budget had run out.
+    """
+    stats["depth"] = 0
+    stats["nodes"] = 0
+    me = player(board, k)
+    if me is None:
+        return None
+
+    lines = layout_of(board, k)
+    n = lines.n
+    cells = [cell for row in board for cell in row]
+    empty = cells.count(EMPTY)
+    them = O if me == X else X
+    deadline = time.perf_counter() + time_budget
+
+    moves = candidates(lines, cells)
+    best_move = moves[0]
+    for depth in range(1, min(empty, max_depth or empty) + 1):
+        try:
+            alpha = -WIN - 1
+            depth_best = None
+            for cell in candidates(lines, cells, best_move):
+                cells[cell] = me
+                if lines.wins_at(cells, cell):
+                    score = WIN
+                else:
+                    score = -negamax(lines, cells, them, depth - 1, 1, -WIN - 1, -alpha, empty - 1,
+                                      deadline, cancel)
+                cells[cell] = EMPTY
+                if score > alpha:
+                    alpha, depth_best = score, cell
+        except SearchTimeout:
+            break
+        best_move = depth_best
+        stats["depth"] = depth
+        if alpha >= WIN - depth:
+            break  # a forced win, deeper search cannot improve on it
+    return divmod(best_move, n)
@@ -1,9 +1,52 @@
 import pygame
 import sys
+import threading
 import time
 
+import mnk
 import tictactoe as ttt
 
+# Board rows, columns and marks in a row to win: python runner.py [m n k]
+if len(sys.argv) not in (1, 4):
+    sys.exit("Usage: python runner.py [m n k]")
+m, n, k = map(int, sys.argv[1:]) if len(sys.argv) == 4 else (3, 3, 3)
+classic = (m, n, k) == (3, 3, 3)
+
+# Seconds the AI may think per move on boards too big to solve
+time_budget = 2.0
+
+
+def choose_move(board, cancel):
+    """Runs on the AI thread: 3x3 uses tictactoe's solver, bigger boards mnk."""
+    if classic:
+        move = ttt.minimax(board)
+        print(f"AI played {move}: {ttt.stats['nodes']} nodes ({ttt.stats['strategy']})")
+    else:
+        move = mnk.minimax(board, k, time_budget, cancel=cancel)
+        print(f"AI played {move}: {mnk.stats['nodes']} nodes, depth {mnk.stats['depth']}")
+    return move
+
+
+def think(job, board):
+    """Thread target: stores the AI's move in job unless it was cancelled."""
+    move = choose_move(board, job["cancel"])
+    if not job["cancel"].is_set():
+        job["move"] = move
+        job["done"] = True
+
+
+def start_thinking(board):
+    """Starts the AI searching in the background and returns its job."""
+    job = {"cancel": threading.Event(), "move": None, "done": False}
+    threading.Thread(target=think, args=(job, [row[:] for row in board]), daemon=True).start()
+    return job
+
+
+def cancel_thinking(job):
+    if job is not None:
+        job["cancel"].set()
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,11 +58,15 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# Fit the board between the title and the bottom button
+tile_size = min(80, (height - 140) // m, (width - 40) // n)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = mnk.initial_state(m, n)
+# The AI's search in progress, if any
+ai_job = None
 
 while True:
 
@@ -67,13 +114,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (n / 2 * tile_size),
+                       height / 2 - (m / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(m):
             row = []
-            for j in range(3):
+            for j in range(n):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +135,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = mnk.terminal(board, k)
+        player = mnk.player(board, k)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = mnk.winner(board, k)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,45 +148,45 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            # animate the dots so it is clear the window is still alive
+            title = "Computer thinking" + "." * (int(time.time() * 2) % 4)
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, searching in the background so the window keeps drawing
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_job is None:
+                ai_job = start_thinking(board)
+            elif ai_job["done"]:
+                board = mnk.result(board, ai_job["move"], k)
+                ai_job = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(m):
+                for j in range(n):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
-
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                        board = mnk.result(board, (i, j), k)
+
+        # Play Again once the game is over, Reset (which also stops the AI) before that
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again" if game_over else "Reset", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                user = None
+                board = mnk.initial_state(m, n)
+                cancel_thinking(ai_job)
+                ai_job = None
 
     pygame.display.flip()
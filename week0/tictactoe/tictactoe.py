@@ -2,12 +2,26 @@
 Tic Tac Toe Player
 """
 import copy
+import json
 import math
 
+import bitboard
+import book
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Minimax value of every position searched so far, keyed by position_key,
+# so symmetric positions share one entry
+transposition_table = {}
+
+# Search counters, reset by every minimax call
+stats = {"strategy": None, "nodes": 0}
+
+# Cells in the order alpha-beta tries them once winning and blocking moves are out of the way
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]
+
 
 def initial_state():
     """
@@ -72,9 +86,10 @@ def winner(board):
     """
     # rows&cols check:
     for i in range(3):
-        if board[i][0] == board[i][1] == board[i][2]:# row check
+        # an all-EMPTY line is not a win, so keep scanning past it
+        if board[i][0] is not EMPTY and board[i][0] == board[i][1] == board[i][2]:# row check
             return board[i][0]
-        elif board[0][i] == board[1][i] == board[2][i]:# col check
+        if board[0][i] is not EMPTY and board[0][i] == board[1][i] == board[2][i]:# col check
             return board[0][i]
 
     # diagonal checks
@@ -104,49 +119,284 @@ def utility(board):
             return -1
     return 0
 
-def max_value(board):
-    v = -(math.inf)
-    if terminal(board):
-        return utility(board)
-    for action in actions(board):
-        v = max(v, min_value(result(board,action)))
+def position_key(x, o):
+    """
+    Returns an int encoding the (x, o) bitboards of a position that is the
+    same for every rotation and reflection of it.
+    """
+    x, o, _ = bitboard.canonical(x, o)
+    return x << 9 | o
+
+
+def board_key(board):
+    """
+    Returns the position_key of a nested-list board.
+    """
+    return position_key(*bitboard.encode(board))
+
+
+def load_table(path):
+    """
+    Merges a transposition table saved by save_table into the current one.
+    """
+    with open(path) as f:
+        # JSON turned the int keys into strings
+        transposition_table.update((int(key), v) for key, v in json.load(f).items())
+
+
+def save_table(path):
+    """
+    Writes the transposition table to path as JSON.
+    """
+    with open(path, "w") as f:
+        json.dump(transposition_table, f)
+
+
+class GameState():
+    """
+    A board that keeps its bitboards, side to move, empty cells and winner
+    up to date as moves are made and unmade, so search neither rescans
+    nor copies it.
+    """
+
+    def __init__(self, board=None):
+        self.board = initial_state() if board is None else [row[:] for row in board]
+        self.empty = {(i, j) for i in range(3) for j in range(3) if self.board[i][j] is EMPTY}
+        self.x, self.o = bitboard.encode(self.board)
+        self.to_move = O if self.x.bit_count() > self.o.bit_count() else X
+        self.winner = winner(self.board)
+        # actions made on this object, most recent last
+        self.history = []
+
+    def player(self):
+        return None if self.terminal() else self.to_move
+
+    def terminal(self):
+        return self.winner is not None or not self.empty
+
+    def utility(self):
+        return 1 if self.winner == X else -1 if self.winner == O else 0
+
+    def make(self, action):
+        """
+        Plays the side to move at action.
+        """
+        if self.terminal() or action not in self.empty:
+            raise Exception(f"Invalid action: {action}")
+        i, j = action
+        mark = self.to_move
+        self.board[i][j] = mark
+        self.empty.remove(action)
+        self.history.append(action)
+        if mark == X:
+            self.x |= 1 << (3 * i + j)
+            won = bitboard.WINS[self.x]
+        else:
+            self.o |= 1 << (3 * i + j)
+            won = bitboard.WINS[self.o]
+        if won:
+            self.winner = mark
+        self.to_move = O if mark == X else X
+
+    def unmake(self):
+        """
+        Takes back the most recent move.
+        """
+        action = self.history.pop()
+        i, j = action
+        self.board[i][j] = EMPTY
+        self.empty.add(action)
+        # the side that moved is the one not to move now
+        if self.to_move == O:
+            self.x &= ~(1 << (3 * i + j))
+        else:
+            self.o &= ~(1 << (3 * i + j))
+        # moves are only made while nobody has won
+        self.winner = None
+        self.to_move = O if self.to_move == X else X
+
+
+def value(state):
+    """
+    Returns the minimax value of state, memoized in the transposition table.
+    """
+    stats["nodes"] += 1
+    key = position_key(state.x, state.o)
+    if key in transposition_table:
+        return transposition_table[key]
+    if state.terminal():
+        v = state.utility()
+    else:
+        values = []
+        for action in list(state.empty):
+            state.make(action)
+            values.append(value(state))
+            state.unmake()
+        v = max(values) if state.to_move == X else min(values)
+    transposition_table[key] = v
     return v
 
+
+def max_value(board):
+    """
+    Returns the minimax value of a board where X is to move.
+    """
+    return value(GameState(board))
+
 def min_value(board):
-    v = math.inf
-    if terminal(board):
-        return utility(board)
-    for action in actions(board):
-        v = min(v, max_value(result(board, action)))
+    """
+    Returns the minimax value of a board where O is to move.
+    """
+    return value(GameState(board))
+
+
+def alphabeta_value(state, alpha, beta):
+    """
+    Returns the minimax value of state, or a bound on it outside (alpha, beta),
+    skipping replies that cannot change the result.
+    """
+    stats["nodes"] += 1
+    if state.terminal():
+        return state.utility()
+
+    maximizing = state.to_move == X
+    v = -math.inf if maximizing else math.inf
+    for action in ordered_actions(state):
+        state.make(action)
+        child = alphabeta_value(state, alpha, beta)
+        state.unmake()
+        if maximizing:
+            v = max(v, child)
+            if v >= beta:
+                return v  # O already has something better elsewhere
+            alpha = max(alpha, v)
+        else:
+            v = min(v, child)
+            if v <= alpha:
+                return v  # X already has something better elsewhere
+            beta = min(beta, v)
     return v
 
-def minimax(board):
+
+def ordered_actions(state):
+    """
+    Returns the empty cells of state with the ones most likely to be best first:
+    winning moves, then blocking moves, then center, corners and edges.
+    """
+    me = state.to_move
+    opponent = O if me == X else X
+
+    def rank(action):
+        if completes_line(state.board, action, me):
+            return 0
+        if completes_line(state.board, action, opponent):
+            return 1
+        return 2
+
+    return sorted(state.empty, key=lambda action: (rank(action), MOVE_ORDER.index(action)))
+
+
+def completes_line(board, action, mark):
+    """
+    Returns True if mark at action gives mark three in a row,
+    whatever is at action now.
+    """
+    i, j = action
+    lines = [[(i, c) for c in range(3)], [(r, j) for r in range(3)]]
+    if i == j:
+        lines.append([(d, d) for d in range(3)])
+    if i + j == 2:
+        lines.append([(d, 2 - d) for d in range(3)])
+    for line in lines:
+        if all(board[r][c] == mark for r, c in line if (r, c) != action):
+            return True
+    return False
+
+
+def alphabeta(board):
+    """
+    Returns the optimal action for the current player using alpha-beta
+    pruning, stopping as soon as a forced win is found.
+    """
+    state = GameState(board)
+    current_player = state.to_move
+    best_action = None
+    # utility never leaves [-1, 1], so these bounds let a win cut the search short
+    alpha, beta = -1, 1
+
+    for action in ordered_actions(state):
+        state.make(action)
+        v = alphabeta_value(state, alpha, beta)
+        state.unmake()
+        if current_player == X and (best_action is None or v > alpha):
+            best_action = action
+            alpha = max(alpha, v)
+        elif current_player == O and (best_action is None or v < beta):
+            best_action = action
+            beta = min(beta, v)
+        if alpha >= beta:
+            break
+    return best_action
+
+
+def exhaustive(board):
+    """
+    Returns the optimal action for the current player by searching
+    every reply, memoized in the transposition table.
+    """
+    state = GameState(board)
+    current_player = state.to_move
+
+    best_action = None
+    best_value = None
+    for action in actions(board):
+        state.make(action) # make the current possible action
+        v = value(state) # check how the adversary plays his game
+        state.unmake()
+        if (best_value is None
+                or current_player == X and v > best_value
+                or current_player == O and v < best_value):
+            best_value = v
+            best_action = action
+    return best_action
+
+
+def bitboard_search(board):
+    """
+    Returns the optimal action for the current player from the
+    bitboard engine, which searches on ints without copying boards.
+    """
+    action = bitboard.minimax(board)
+    stats["nodes"] = bitboard.stats["nodes"]
+    return action
+
+
+def book_lookup(board):
+    """
+    Returns the optimal action for the current player straight from the
+    precomputed perfect-play book, without searching.
+    """
+    return book.minimax(board)
+
+
+# Search strategies minimax can use, by name
+STRATEGIES = {
+    "exhaustive": exhaustive,
+    "alphabeta": alphabeta,
+    "bitboard": bitboard_search,
+    "book": book_lookup,
+}
+
+
+def minimax(board, strategy="exhaustive"):
     """
     Returns the optimal action for the current player on the board.
+
+    strategy names one of STRATEGIES; afterwards stats holds the
+    strategy used and the number of nodes it visited for this move.
     """
+    stats["strategy"] = strategy
+    stats["nodes"] = 0
     if terminal(board):
         return None
-
-    current_player = player(board)
-
-    if current_player == X:
-        best_action = None
-        best_value = -math.inf
-        for action in actions(board):
-            new_board = result(board, action)
-            value = min_value(new_board)
-            if value > best_value:
-                best_value = value
-                best_action = action
-        return best_action
-
-    elif current_player == O:
-        best_action = None
-        best_value = math.inf
-        for action in actions(board):
-            new_board = result(board,action) # make the current possible action
-            value = max_value(new_board) # check how the adversary plays his max-game
-            if best_value > value:
-                best_value = value
-                best_action = action
-        return best_action
\ No newline at end of file
+    return STRATEGIES[strategy](board)
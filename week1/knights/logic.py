@@ -1,5 +1,14 @@
 import itertools
 
+# Above this many symbols model_check hands entailment to the SAT solver in
+# sat.py instead of enumerating all 2 ** n models
+SAT_THRESHOLD = 16
+
+# Models evaluated per compiled call: 2 ** BATCH_BITS over int bitmasks,
+# 2 ** NUMPY_BATCH_BITS over NumPy boolean columns
+BATCH_BITS = 16
+NUMPY_BATCH_BITS = 20
+
 
 class Sentence():
 
@@ -11,6 +20,10 @@ class Sentence():
         """Returns string formula representing logical sentence."""
         return ""
 
+    def bitwise(self, compiled):
+        """Returns a Python expression computing the sentence over int bitmasks."""
+        raise Exception("nothing to compile")
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
         return set()
@@ -66,6 +79,9 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
+    def bitwise(self, compiled):
+        return compiled.symbol(self.name)
+
     def symbols(self):
         return {self.name}
 
@@ -90,6 +106,9 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
+    def bitwise(self, compiled):
+        return "~" + compiled.operand(self.operand)
+
     def symbols(self):
         return self.operand.symbols()
 
@@ -127,6 +146,9 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    def bitwise(self, compiled):
+        return " & ".join(compiled.operand(conjunct) for conjunct in self.conjuncts) or "TRUE"
+
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
@@ -158,6 +180,9 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
+    def bitwise(self, compiled):
+        return " | ".join(compiled.operand(disjunct) for disjunct in self.disjuncts) or "FALSE"
+
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
@@ -189,6 +214,11 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
+    def bitwise(self, compiled):
+        antecedent = compiled.operand(self.antecedent)
+        consequent = compiled.operand(self.consequent)
+        return f"~{antecedent} | {consequent}"
+
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
@@ -222,43 +252,176 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
+    def bitwise(self, compiled):
+        left = compiled.operand(self.left)
+        right = compiled.operand(self.right)
+        return f"~({left} ^ {right})"
+
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
+class Compiled():
+    """
+    A sentence compiled to one straight-line Python function over int
+    bitmasks. Each symbol is passed in as an int whose bit i is its value in
+    model i, and the result has bit i set where the sentence is true in model
+    i. That evaluates a whole batch of models in a few big-int operations.
+    Shared subsentences are computed once.
+
+    The same code runs on NumPy boolean arrays, one element per model, when
+    true and false are given as np.True_ and np.False_.
+    """
+
+    def __init__(self, sentence, symbols=None, true=-1, false=0):
+        if symbols is None:
+            symbols = sorted(sentence.symbols())
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.lines = []
+        self.names = {}
+        result = self.operand(sentence)
+        source = "def evaluate(v):\n" + "".join(self.lines) + f"    return {result}\n"
+        namespace = {"TRUE": true, "FALSE": false}
+        exec(source, namespace)
+        self.function = namespace["evaluate"]
+
+    def symbol(self, name):
+        try:
+            return f"v[{self.index[name]}]"
+        except KeyError:
+            raise Exception(f"variable {name} not in symbols")
+
+    def operand(self, sentence):
+        """Returns the name of a local holding the value of sentence."""
+        if sentence not in self.names:
+            expression = sentence.bitwise(self)
+            if isinstance(sentence, Symbol):
+                self.names[sentence] = expression
+            else:
+                name = f"t{len(self.lines)}"
+                self.lines.append(f"    {name} = {expression}\n")
+                self.names[sentence] = name
+        return self.names[sentence]
+
+    def __call__(self, columns):
+        """
+        Evaluates the sentence over one int per symbol, in the order of
+        self.symbols. Bits past the models passed in are meaningless, so
+        callers mask the result.
+        """
+        return self.function(columns)
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def evaluate(self, model):
+        """Evaluates the sentence in a single model, like Sentence.evaluate."""
+        try:
+            return bool(self.function([-int(bool(model[symbol])) for symbol in self.symbols]) & 1)
+        except KeyError as error:
+            raise Exception(f"variable {error.args[0]} not in model")
+
+
+def columns(count, bits):
+    """
+    Returns the int bitmasks of the first count symbols over the 2 ** bits
+    models of a batch: symbol i is true in model m when bit i of m is set.
+    """
+    size = 1 << bits
+    everything = (1 << size) - 1
+    return [
+        everything // ((1 << (2 << i)) - 1) * (((1 << (1 << i)) - 1) << (1 << i))
+        for i in range(count)
+    ]
+
+
+def batches(sentences, symbols, method="bitwise"):
+    """
+    Evaluates sentences in all 2 ** len(symbols) models, a batch at a time.
+    Yields a list per batch with the value of each sentence in every model
+    of the batch: an int with one bit per model for method "bitwise", or a
+    NumPy boolean array with one element per model for method "numpy".
+    """
+    symbols = list(symbols)
+    if method == "bitwise":
+        bits = min(len(symbols), BATCH_BITS)
+        compiled = [Compiled(sentence, symbols) for sentence in sentences]
+        low = columns(bits, bits)
+        mask = (1 << (1 << bits)) - 1
+        for batch in range(1 << (len(symbols) - bits)):
+            high = [-(batch >> i & 1) for i in range(len(symbols) - bits)]
+            yield [function(low + high) & mask for function in compiled]
+    elif method == "numpy":
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("method 'numpy' needs NumPy installed")
+        bits = min(len(symbols), NUMPY_BATCH_BITS)
+        compiled = [Compiled(sentence, symbols, np.True_, np.False_) for sentence in sentences]
+        rows = np.arange(1 << bits)
+        low = [(rows >> i & 1).astype(bool) for i in range(bits)]
+        for batch in range(1 << (len(symbols) - bits)):
+            high = [np.bool_(batch >> i & 1) for i in range(len(symbols) - bits)]
+            # a sentence over only the fixed symbols comes out as a scalar
+            yield [np.broadcast_to(function(low + high), rows.shape) for function in compiled]
+    else:
+        raise ValueError(f"unknown method {method!r}")
+
+
+def truth_table(knowledge, query, method="bitwise"):
+    """
+    Enumerates every model of the symbols in knowledge and query. Returns
+    (entailed, count): whether knowledge entails query, and how many of the
+    models knowledge is true in.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    count = 0
+    entailed = True
+    for known, answer in batches([knowledge, query], symbols, method):
+        if method == "numpy":
+            count += int(known.sum())
+            entailed = entailed and not (known & ~answer).any()
         else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
-
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+            count += known.bit_count()
+            entailed = entailed and not (known & ~answer)
+    return entailed, count
+
+
+def model_check(knowledge, query, method=None):
+    """
+    Checks if knowledge base entails query.
+
+    method is "sat" to solve KB ∧ ¬query with sat.py, or "bitwise" or
+    "numpy" to evaluate it in every model (see batches). By default it is
+    "sat" above SAT_THRESHOLD symbols and "bitwise" otherwise.
+    """
+    return model_check_all(knowledge, [query], method)[0]
+
+
+def model_check_all(knowledge, queries, method=None):
+    """
+    Checks which of queries knowledge base entails, returning a list of
+    bools in the same order. The models of knowledge are enumerated or
+    solved for once for all the queries; method is as for model_check.
+    """
+    queries = list(queries)
+
+    # Get all symbols in knowledge and every query
+    symbols = set.union(knowledge.symbols(), *[query.symbols() for query in queries])
+    if method is None:
+        method = "sat" if len(symbols) > SAT_THRESHOLD else "bitwise"
+
+    # Too many models to enumerate, ask a SAT solver instead
+    if method == "sat":
+        import sat
+        return sat.entailed(knowledge, queries)
+
+    # A query is entailed unless some model has knowledge true and it false
+    entailed = [True] * len(queries)
+    for known, *answers in batches([knowledge, *queries], sorted(symbols), method):
+        for i, answer in enumerate(answers):
+            if entailed[i]:
+                counterexample = known & ~answer
+                if counterexample.any() if method == "numpy" else counterexample:
+                    entailed[i] = False
+        if not any(entailed):
+            break
+    return entailed
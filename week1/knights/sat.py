@@ -0,0 +1,334 @@
+"""
+SAT backend for logic.py: a Tseitin CNF compiler for Sentence trees and a
+CDCL solver (unit propagation over two watched literals, first-UIP clause
+learning, non-chronological backjumping, activity-ordered decisions and
+restarts). Entailment KB |= query is checked as KB ∧ ¬query being UNSAT.
+"""
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses over integer variables built from sentences by the Tseitin
+    transformation: every connective gets a fresh variable constrained to
+    equal it, so the CNF grows linearly with the sentence.
+    """
+
+    def __init__(self):
+        # symbol name -> variable
+        self.variables = {}
+        # every sub-sentence already encoded -> its literal
+        self.literals = {}
+        self.clauses = []
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """Adds sentence as a constraint every solution must satisfy."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when sentence is."""
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.new_variable()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            v = self.new_variable()
+            self.clauses.extend([-v, part] for part in parts)
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            v = self.new_variable()
+            self.clauses.extend([v, -part] for part in parts)
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Implication):
+            antecedent = self.literal(sentence.antecedent)
+            consequent = self.literal(sentence.consequent)
+            v = self.new_variable()
+            self.clauses += [[-v, -antecedent, consequent], [v, antecedent], [v, -consequent]]
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            v = self.new_variable()
+            self.clauses += [[-v, -left, right], [-v, left, -right],
+                             [v, left, right], [v, -left, -right]]
+        else:
+            raise TypeError(f"cannot convert {type(sentence).__name__} to CNF")
+        self.literals[sentence] = v
+        return v
+
+
+class Solver():
+    """A CDCL SAT solver over clauses of nonzero int literals."""
+
+    def __init__(self, clauses, count):
+        self.count = count
+        # variable -> True/False/None, decision level, and index of the clause that implied it
+        self.values = [None] * (count + 1)
+        self.levels = [0] * (count + 1)
+        self.reasons = [None] * (count + 1)
+        self.activity = [0.0] * (count + 1)
+        # last value each variable had, tried first when deciding it again
+        self.phase = [False] * (count + 1)
+        self.bump = 1.0
+        self.trail = []
+        # trail length at the start of each decision level
+        self.limits = []
+        self.head = 0
+        self.clauses = []
+        # literal -> indices of the clauses watching it
+        self.watches = {}
+        self.unsat = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def level(self):
+        return len(self.limits)
+
+    def add_clause(self, clause):
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return  # always satisfied
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            if self.value(clause[0]) is False:
+                self.unsat = True
+            elif self.value(clause[0]) is None:
+                self.assign(clause[0], None)
+        else:
+            self.watch(clause)
+
+    def watch(self, clause):
+        """Stores a clause of two or more literals, watching the first two."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = self.level()
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal the current assignment forces. Returns the
+        index of a clause with every literal false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+                # keep the falsified watch in slot 1
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.value(clause[0]) is True:
+                    kept.append(index)
+                    continue
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches.setdefault(clause[1], []).append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) is False:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false] = kept
+                        return index
+                    self.assign(clause[0], index)
+            self.watches[false] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learnt from a conflict, asserting
+        literal first, and the level to jump back to.
+        """
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable not in seen and self.levels[variable] > 0:
+                    seen.add(variable)
+                    self.activity[variable] += self.bump
+                    if self.levels[variable] == self.level():
+                        pending += 1
+                    else:
+                        learnt.append(other)
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+        learnt[0] = -literal
+
+        # decay older activity by growing the bump instead
+        self.bump *= 1.05
+        if self.bump > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.bump *= 1e-100
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # watch the literal from the deepest remaining level second
+        deepest = max(range(1, len(learnt)), key=lambda i: self.levels[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self.levels[abs(learnt[1])]
+
+    def backjump(self, level):
+        if self.level() <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = self.values[variable]
+            self.values[variable] = None
+            self.reasons[variable] = None
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        best = None
+        for variable in range(1, self.count + 1):
+            if self.values[variable] is None and (
+                    best is None or self.activity[variable] > self.activity[best]):
+                best = variable
+        return best
+
+    def solve(self, assumptions=()):
+        """
+        Returns a satisfying assignment as a list indexed by variable, or
+        None if there is none with every literal in assumptions true.
+
+        Clauses learnt along the way stay, so solving again under other
+        assumptions reuses the work.
+        """
+        self.backjump(0)
+        if self.unsat or self.propagate() is not None:
+            self.unsat = True
+            return None
+        conflicts = 0
+        restart = 100
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if self.level() == 0:
+                    self.unsat = True
+                    return None
+                conflicts += 1
+                learnt, level = self.analyze(conflict)
+                self.backjump(level)
+                if len(learnt) == 1:
+                    self.assign(learnt[0], None)
+                else:
+                    self.assign(learnt[0], self.watch(learnt))
+                continue
+
+            if conflicts >= restart:
+                conflicts = 0
+                restart = int(restart * 1.5)
+                self.backjump(0)
+                continue
+
+            # assumptions are the first decisions, one level each
+            if self.level() < len(assumptions):
+                literal = assumptions[self.level()]
+                if self.value(literal) is False:
+                    return None
+                self.limits.append(len(self.trail))
+                if self.value(literal) is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return list(self.values)
+            self.limits.append(len(self.trail))
+            self.assign(variable if self.phase[variable] else -variable, None)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model (symbol name -> bool) satisfying sentence, or None.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    values = Solver(cnf.clauses, cnf.count).solve()
+    if values is None:
+        return None
+    return {name: values[variable] for name, variable in cnf.variables.items()}
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query, as KB ∧ ¬query being unsatisfiable."""
+    return satisfiable(And(knowledge, Not(query))) is None
+
+
+def entailed(knowledge, queries):
+    """
+    Returns a list with, for each of queries, whether knowledge entails it.
+
+    One solver holds the knowledge base and is asked once per query for a
+    model where that query is false, keeping what it learns between queries.
+    Every model found also rules out the other queries false in it, so the
+    queries left at the end are exactly the ones in the backbone.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    literals = [cnf.literal(query) for query in queries]
+    solver = Solver(cnf.clauses, cnf.count)
+
+    def holds(values, literal):
+        return values[abs(literal)] == (literal > 0)
+
+    values = solver.solve()
+    if values is None:
+        return [True] * len(literals)  # an inconsistent KB entails everything
+    result = [False] * len(literals)
+    candidates = [i for i, literal in enumerate(literals) if holds(values, literal)]
+    while candidates:
+        i = candidates.pop()
+        values = solver.solve([-literals[i]])
+        if values is None:
+            result[i] = True
+        else:
+            candidates = [j for j in candidates if holds(values, literals[j])]
+    return result